@@ -1,12 +1,15 @@
+import filecmp
 import os
+import tempfile
 import uuid
 from typing import Dict, List, Any, Optional
 import polars as pl
 from .diff_engine import diff_csv_core
 from .csv_processor import load_and_normalize_dfs, normalize_string
 
-def compare_csv_files(file1: str, file2: str, key_columns: List[str], 
-                     delimiter: str = ',', output_file: Optional[str] = None) -> Dict[str, Any]:
+def compare_csv_files(file1: str, file2: str, key_columns: List[str],
+                     delimiter: str = ',', output_file: Optional[str] = None,
+                     output_format: str = 'csv') -> Dict[str, Any]:
     """
     Programmatic CSV comparison function for LLM agents.
     
@@ -20,7 +23,8 @@ def compare_csv_files(file1: str, file2: str, key_columns: List[str],
         key_columns (List[str]): Column names to use as composite key for matching rows
         delimiter (str): CSV delimiter character (default: ',')
         output_file (Optional[str]): Output file path. If None, auto-generates unique filename
-    
+        output_format (str): Diff report format: 'csv' (default), 'feather', or 'parquet'
+
     Returns:
         Dict containing:
             - status (str): 'success', 'no_differences', or 'error'
@@ -73,7 +77,7 @@ def compare_csv_files(file1: str, file2: str, key_columns: List[str],
         # Generate output filename if not provided
         if output_file is None:
             session_id = str(uuid.uuid4())[:8]
-            output_file = f"diff_{session_id}.csv"
+            output_file = f"diff_{session_id}.{output_format}"
         
         # Validate key columns exist in both files
         try:
@@ -108,7 +112,27 @@ def compare_csv_files(file1: str, file2: str, key_columns: List[str],
                 'error_message': f"Error reading CSV headers: {str(e)}",
                 'files_processed': [file1, file2]
             }
-        
+
+        # Fast path: byte-identical files cannot differ, so skip loading and
+        # comparing the DataFrames entirely. filecmp checks sizes first and
+        # only then streams the bytes, so mismatched files bail out cheaply.
+        if filecmp.cmp(file1, file2, shallow=False):
+            return {
+                'status': 'no_differences',
+                'differences_found': False,
+                'output_file': None,
+                'summary': {
+                    'total_differences': 0,
+                    'unique_rows': 0,
+                    'modified_rows': 0,
+                    'files_compared': [os.path.basename(file1), os.path.basename(file2)],
+                    'common_columns': len(set(df1_cols) & set(df2_cols)),
+                    'key_columns_used': key_columns
+                },
+                'error_message': None,
+                'files_processed': [file1, file2]
+            }
+
         # Load and normalize dataframes
         df1_raw, df2_raw, df1_normalized_keys, df2_normalized_keys = load_and_normalize_dfs(file1, file2, delimiter, key_columns)
 
@@ -116,7 +140,7 @@ def compare_csv_files(file1: str, file2: str, key_columns: List[str],
         # CRITICAL: Must use df1_normalized_keys/df2_normalized_keys, NOT df1_raw/df2_raw
         # Raw DataFrames have NULL key columns which fail anti-joins (NULL != NULL in Polars)
         differences_found, result_file, summary = diff_csv_core(
-            df1_normalized_keys, df2_normalized_keys, os.path.basename(file1), os.path.basename(file2), delimiter, key_columns, output_file
+            df1_normalized_keys, df2_normalized_keys, os.path.basename(file1), os.path.basename(file2), delimiter, key_columns, output_file, output_format
         )
         
         if differences_found:
@@ -148,8 +172,9 @@ def compare_csv_files(file1: str, file2: str, key_columns: List[str],
             'files_processed': [file1, file2]
         }
 
-def quick_csv_diff(file1: str, file2: str, auto_detect_keys: bool = True, 
-                   delimiter: str = ',', output_file: Optional[str] = None) -> Dict[str, Any]:
+def quick_csv_diff(file1: str, file2: str, auto_detect_keys: bool = True,
+                   delimiter: str = ',', output_file: Optional[str] = None,
+                   output_format: str = 'csv') -> Dict[str, Any]:
     """
     One-function CSV diff with automatic key detection for LLM agents.
     
@@ -162,7 +187,8 @@ def quick_csv_diff(file1: str, file2: str, auto_detect_keys: bool = True,
         auto_detect_keys (bool): Whether to automatically detect key columns (default: True)
         delimiter (str): CSV delimiter character (default: ',')
         output_file (Optional[str]): Output file path. If None, auto-generates unique filename
-    
+        output_format (str): Diff report format: 'csv' (default), 'feather', or 'parquet'
+
     Returns:
         Dict containing all fields from compare_csv_files() plus:
             - key_detection (Dict): Information about key detection process
@@ -280,7 +306,7 @@ def quick_csv_diff(file1: str, file2: str, auto_detect_keys: bool = True,
         
         # Perform the comparison using detected keys
         comparison_result = compare_csv_files(
-            file1, file2, recommended_keys, delimiter, output_file
+            file1, file2, recommended_keys, delimiter, output_file, output_format
         )
         
         # Add key detection information to the result
@@ -566,7 +592,12 @@ def simple_csv_compare(file1: str, file2: str, keys: List[str], delimiter: str =
         ...     print("Files are identical")
     """
     try:
-        result = compare_csv_files(file1, file2, keys, delimiter)
+        # Only the boolean matters here: route the report to the temp dir
+        # and drop it, so the call leaves no diff file in the working dir
+        output_file = os.path.join(tempfile.gettempdir(), f"diff_{uuid.uuid4()}.csv")
+        result = compare_csv_files(file1, file2, keys, delimiter, output_file=output_file)
+        if os.path.exists(output_file):
+            os.remove(output_file)
         return result.get('differences_found', False)
     except:
         return False
@@ -109,6 +109,7 @@ def main_cli():
         --delimiter (str): CSV delimiter (default: ',')
         --key (str): Comma-separated key column names (required for CLI mode)
         --output (str): Output file path (default: 'diff.csv')
+        --output-format (str): Diff report format: 'csv', 'feather', or 'parquet' (default: 'csv')
     
     AI Agent Usage:
         Recommended approach:
@@ -134,16 +135,18 @@ def main_cli():
     parser.add_argument("--delimiter", default=",", help="CSV delimiter (default: ',')")
     parser.add_argument("--key", help="Comma-separated list of column names to use as key")
     parser.add_argument("--output", default="diff.csv", help="Output CSV file (default: diff.csv)")
+    parser.add_argument("--output-format", default="csv", choices=["csv", "feather", "parquet"],
+                        help="Output format for the diff report (default: csv)")
     args = parser.parse_args()
 
     # If both files and key are provided, run in CLI mode
     if args.file1 and args.file2:
         if args.key:
             key_columns = [col.strip() for col in args.key.split(",")]
-            result = compare_csv_files(args.file1, args.file2, delimiter=args.delimiter, key_columns=key_columns, output_file=args.output)
+            result = compare_csv_files(args.file1, args.file2, delimiter=args.delimiter, key_columns=key_columns, output_file=args.output, output_format=args.output_format)
         else:
             print("No key columns provided. Attempting to auto-detect keys.")
-            result = quick_csv_diff(args.file1, args.file2, delimiter=args.delimiter, output_file=args.output)
+            result = quick_csv_diff(args.file1, args.file2, delimiter=args.delimiter, output_file=args.output, output_format=args.output_format)
         
         if result['status'] in ['success', 'no_differences']:
             if result['differences_found']:
@@ -3,25 +3,27 @@ import os
 from typing import List, Any
 from .csv_processor import normalize_string, normalize_column_expr
 
-def process_unique_row_polars(df_unique: pl.DataFrame, source_file_name: str, key_columns: List[str], final_columns: List[str]) -> pl.DataFrame:
+def process_unique_row_polars(df_unique: pl.LazyFrame, source_file_name: str, key_columns: List[str], final_columns: List[str]) -> pl.LazyFrame:
     """
     Processes unique rows identified during CSV comparison, ensuring consistent output columns.
 
+    Expects key columns to be already normalized (as done at the top of
+    diff_csv_core), so the surrogate key is a plain concatenation.
+
     Args:
-        df_unique (pl.DataFrame): DataFrame containing rows unique to one file.
+        df_unique (pl.LazyFrame): LazyFrame containing rows unique to one file.
         source_file_name (str): Name of the source file (file1 or file2).
         key_columns (List[str]): List of column names used as composite key.
         final_columns (List[str]): The exact list of columns expected in the final output DataFrame.
 
     Returns:
-        pl.DataFrame: DataFrame with unique rows formatted for the diff output, with consistent columns.
+        pl.LazyFrame: LazyFrame with unique rows formatted for the diff output, with consistent columns.
     """
-    if df_unique.is_empty():
-        return pl.DataFrame()
+    df_columns = df_unique.collect_schema().names()
 
     surrogate_key_expr = pl.concat_str([
-        normalize_column_expr(col)
-        for col in key_columns if col in df_unique.columns
+        pl.col(col)
+        for col in key_columns if col in df_columns
     ], separator='|')
 
     # Prepare the DataFrame with fixed columns and then select/fill based on final_columns
@@ -35,158 +37,209 @@ def process_unique_row_polars(df_unique: pl.DataFrame, source_file_name: str, ke
     processed_df = processed_df.filter(pl.col('surrogate_key') != "")
 
     # Ensure all final_columns are present, filling with nulls if not
-    # and select them in the correct order
-    select_expressions = []
-    for col in final_columns:
-        if col in processed_df.columns:
-            select_expressions.append(pl.col(col))
-        else:
-            select_expressions.append(pl.lit(None).alias(col))
-            
+    # and select them in the correct order. Set membership keeps this O(cols)
+    # rather than O(cols^2) list scans on wide tables.
+    available_columns = set(df_columns) | {'surrogate_key', 'source', 'failed_columns'}
+    select_expressions = [
+        pl.col(col) if col in available_columns else pl.lit(None).alias(col)
+        for col in final_columns
+    ]
+
     return processed_df.select(select_expressions)
 
 
-def diff_csv_core(df1: pl.DataFrame, df2: pl.DataFrame, file1_name: str, file2_name: str, delimiter: str, key_columns: List[str], output_file: str):
+def diff_csv_core(df1: pl.DataFrame, df2: pl.DataFrame, file1_name: str, file2_name: str, delimiter: str, key_columns: List[str], output_file: str, output_format: str = 'csv'):
     """
     Core logic for comparing two Polars DataFrames and generating a diff report.
     This function expects already loaded and partially normalized DataFrames.
+
+    output_format selects the report serialization: 'csv' (default, quoted),
+    'feather' (Arrow IPC with lz4 compression) or 'parquet' (zstd compression).
+    The binary formats skip per-cell quoting/formatting entirely.
+
+    The whole comparison is built as a single lazy query plan so Polars can
+    fuse the joins, the unpivot comparison and the final sort, and only
+    materializes the combined diff once at the end.
     """
-    # Build the column pool
-    column_pool = list(set(df1.columns).union(df2.columns))
+    # Build the common pool (columns present in both), preserving df1's
+    # column order. Going through a set union first only computed the same
+    # intersection the long way and made the output column order depend on
+    # hash randomization.
+    df2_columns = set(df2.columns)
+    common_pool = [col for col in df1.columns if col in df2_columns]
 
-    # Build the common pool (columns present in both)
-    common_pool = [col for col in column_pool if col in df1.columns and col in df2.columns]
-    
-    non_key_cols = [col for col in common_pool if col not in key_columns]
-    non_key_cols.sort()
+    key_columns_set = set(key_columns)
+    non_key_cols = sorted(col for col in common_pool if col not in key_columns_set)
 
     # Define the final column order for consistency across all output DataFrames
-    final_columns = ['source', 'failed_columns', 'surrogate_key'] + key_columns + [col for col in common_pool if col not in key_columns]
+    final_columns = ['source', 'failed_columns', 'surrogate_key'] + key_columns + [col for col in common_pool if col not in key_columns_set]
+
+    # Normalize key columns once up front (idempotent for callers that load
+    # via load_and_normalize_dfs). Every downstream use - the three joins and
+    # both surrogate key builds - then sees the normalized, null-free form
+    # without re-running the normalization expressions.
+    lf1 = df1.lazy().with_columns([
+        normalize_column_expr(col).alias(col)
+        for col in key_columns if col in df1.columns
+    ])
+    lf2 = df2.lazy().with_columns([
+        normalize_column_expr(col).alias(col)
+        for col in key_columns if col in df2.columns
+    ])
 
     # Step 1: Isolate unique rows using anti-joins
     # Rows unique to file1
-    df1_only = df1.join(df2, on=key_columns, how='anti')
+    df1_only = lf1.join(lf2, on=key_columns, how='anti')
     output_df_left_only = process_unique_row_polars(df1_only, file1_name, key_columns, final_columns)
 
     # Rows unique to file2
-    df2_only = df2.join(df1, on=key_columns, how='anti')
+    df2_only = lf2.join(lf1, on=key_columns, how='anti')
     output_df_right_only = process_unique_row_polars(df2_only, file2_name, key_columns, final_columns)
 
     # Step 2: Isolate and compare modified rows using an inner join
-    both_df = df1.join(df2, on=key_columns, how='inner', suffix='_file2')
+    both_df = lf1.join(lf2, on=key_columns, how='inner', suffix='_file2')
 
     # Compare non-key columns to identify modifications
-    if not both_df.is_empty():
-        diff_checks = []
-        for col in non_key_cols:
-            val1_expr = pl.col(col)
-            val2_expr = pl.col(f'{col}_file2')
-            
-            # Check for differences, considering nulls
-            # Use native Polars expressions for 10-100x speedup over map_elements
-            val1_normalized = normalize_column_expr(col)
-            val2_normalized = normalize_column_expr(f'{col}_file2')
-            diff_expr = (
-                (val1_expr.is_null() & val2_expr.is_not_null()) |
-                (val1_expr.is_not_null() & val2_expr.is_null()) |
-                (val1_normalized != val2_normalized)
-            )
-            diff_checks.append(
-                pl.when(diff_expr)
-                .then(pl.lit(col))
-                .otherwise(pl.lit(None))
-            )
-
-        both_df = both_df.with_columns(
-            pl.concat_list(diff_checks).list.drop_nulls().alias('failed_columns')
+    if non_key_cols:
+        # Cheap prefilter on raw values: if every non-key column is identical
+        # on both sides, the row cannot differ after normalization either
+        # (normalization is a pure function of the raw value). A single struct
+        # inequality is one kernel over a row-major view instead of one hash
+        # expression per column; ne_missing keeps null vs value as a difference
+        # and null vs null as a match.
+        raw_diff_expr = pl.struct([pl.col(col) for col in non_key_cols]).ne_missing(
+            pl.struct([pl.col(f'{col}_file2').alias(col) for col in non_key_cols])
+        )
+        both_df = both_df.filter(raw_diff_expr)
+
+        # Unpivot both sides into long form keyed by (row, column) and compare once,
+        # instead of building one full-height when/then column per non-key column.
+        # The long frame only holds actually-differing cells after the filter.
+        both_df = both_df.with_row_index('_row_id')
+
+        left_long = both_df.select(
+            ['_row_id'] + [pl.col(col) for col in non_key_cols]
+        ).unpivot(index='_row_id', variable_name='column_name', value_name='val1')
+
+        right_long = both_df.select(
+            ['_row_id'] + [pl.col(f'{col}_file2').alias(col) for col in non_key_cols]
+        ).unpivot(index='_row_id', variable_name='column_name', value_name='val2')
+
+        long_df = left_long.join(right_long, on=['_row_id', 'column_name'])
+
+        # Check for differences, considering nulls
+        # Use native Polars expressions for 10-100x speedup over map_elements
+        diff_expr = (
+            (pl.col('val1').is_null() & pl.col('val2').is_not_null()) |
+            (pl.col('val1').is_not_null() & pl.col('val2').is_null()) |
+            (normalize_column_expr('val1') != normalize_column_expr('val2'))
+        )
+
+        # Unpivot emits one block per column in non_key_cols order, so the
+        # aggregated lists keep the same column order as the old concat_list.
+        failed_per_row = long_df.filter(diff_expr).group_by(
+            '_row_id', maintain_order=True
+        ).agg(pl.col('column_name').alias('failed_columns'))
+
+        both_df_diff = both_df.join(failed_per_row, on='_row_id', how='inner').drop('_row_id')
+
+        # Key columns were normalized at the top of diff_csv_core
+        surrogate_key_expr = pl.concat_str([pl.col(col) for col in key_columns], separator='|')
+
+        # Construct file1_diff_rows and file2_diff_rows as before
+        file1_diff_rows = both_df_diff.with_columns([
+            surrogate_key_expr.alias('surrogate_key'),
+            pl.lit(file1_name).alias('source'),
+        ]).select(
+            ['surrogate_key', 'source', 'failed_columns'] +
+            [pl.col(col) for col in key_columns] +
+            [pl.col(col) for col in non_key_cols]
+        ).select(final_columns)
+
+        file2_diff_rows = both_df_diff.with_columns([
+            surrogate_key_expr.alias('surrogate_key'),
+            pl.lit(file2_name).alias('source'),
+        ]).select(
+            ['surrogate_key', 'source', 'failed_columns'] +
+            [pl.col(col) for col in key_columns] +
+            [pl.col(f'{col}_file2').alias(col) for col in non_key_cols]
+        ).select(final_columns)
+
+        # Combine modified rows from both files for deduplication
+        combined_modified_rows = pl.concat([file1_diff_rows, file2_diff_rows])
+
+        # Define columns that represent the 'content' of a modified row (excluding 'source')
+        content_cols_for_dedup = [col for col in final_columns if col != 'source']
+
+        # Identify rows that are identical in content but appear from different sources.
+        # These are the "false positives" to be dropped.
+        # Group by content, then filter out groups where the content appears in more than one source.
+
+        # Get counts of each unique content combination
+        content_counts = combined_modified_rows.group_by(content_cols_for_dedup).agg(
+            pl.col('source').n_unique().alias('num_unique_sources')
         )
 
-        both_df_diff = both_df.filter(pl.col('failed_columns').list.len() > 0)
-
-        if not both_df_diff.is_empty():
-            surrogate_key_expr = pl.concat_str([normalize_column_expr(col) for col in key_columns], separator='|')
-
-            # Construct file1_diff_rows and file2_diff_rows as before
-            file1_diff_rows = both_df_diff.with_columns([
-                surrogate_key_expr.alias('surrogate_key'),
-                pl.lit(file1_name).alias('source'),
-            ]).select(
-                ['surrogate_key', 'source', 'failed_columns'] +
-                [pl.col(col) for col in key_columns] +
-                [pl.col(col) for col in non_key_cols]
-            ).select(final_columns)
-
-            file2_diff_rows = both_df_diff.with_columns([
-                surrogate_key_expr.alias('surrogate_key'),
-                pl.lit(file2_name).alias('source'),
-            ]).select(
-                ['surrogate_key', 'source', 'failed_columns'] +
-                [pl.col(col) for col in key_columns] +
-                [pl.col(f'{col}_file2').alias(col) for col in non_key_cols]
-            ).select(final_columns)
-
-            # Combine modified rows from both files for deduplication
-            combined_modified_rows = pl.concat([file1_diff_rows, file2_diff_rows])
-
-            # Define columns that represent the 'content' of a modified row (excluding 'source')
-            content_cols_for_dedup = [col for col in final_columns if col != 'source']
-
-            # Identify rows that are identical in content but appear from different sources.
-            # These are the "false positives" to be dropped.
-            # Group by content, then filter out groups where the content appears in more than one source.
-            
-            # Get counts of each unique content combination
-            content_counts = combined_modified_rows.group_by(content_cols_for_dedup).agg(
-                pl.col('source').n_unique().alias('num_unique_sources')
-            )
-
-            # Filter for content that appears in only one source (i.e., not a false positive)
-            truly_different_content = content_counts.filter(pl.col('num_unique_sources') == 1)
-
-            # Now, semi-join the original combined_modified_rows back to truly_different_content
-            # to get only the rows that are not false positives.
-            deduplicated_modified_rows = combined_modified_rows.join(
-                truly_different_content.select(content_cols_for_dedup),
-                on=content_cols_for_dedup,
-                how='semi'
-            )
-
-            # Step 3: Combine and finalize the results
-            output_df = pl.concat([output_df_left_only, output_df_right_only, deduplicated_modified_rows])
-        else:
-            output_df = pl.concat([output_df_left_only, output_df_right_only])
+        # Filter for content that appears in only one source (i.e., not a false positive)
+        truly_different_content = content_counts.filter(pl.col('num_unique_sources') == 1)
+
+        # Now, semi-join the original combined_modified_rows back to truly_different_content
+        # to get only the rows that are not false positives.
+        deduplicated_modified_rows = combined_modified_rows.join(
+            truly_different_content.select(content_cols_for_dedup),
+            on=content_cols_for_dedup,
+            how='semi'
+        )
+
+        # Step 3: Combine and finalize the results
+        output_lf = pl.concat([output_df_left_only, output_df_right_only, deduplicated_modified_rows])
     else:
-        output_df = pl.concat([output_df_left_only, output_df_right_only])
-    if output_df.is_empty():
-        return False, None, {
-            'total_differences': 0,
-            'unique_rows': 0,
-            'modified_rows': 0,
-            'files_compared': [file1_name, file2_name],
-            'common_columns': len(common_pool),
-            'key_columns_used': key_columns
-        }
+        output_lf = pl.concat([output_df_left_only, output_df_right_only])
 
     # Convert 'failed_columns' list to string just before writing to CSV
-    output_df = output_df.with_columns(
+    output_lf = output_lf.with_columns(
         pl.col('failed_columns').list.join('| - |').alias('failed_columns')
     )
-    
+
     # Sort by surrogate_key first, then by source order (file1 before file2)
     # This groups modified row pairs together: [file1 row, file2 row] for easy side-by-side comparison in spreadsheets
+    # Sorting on a 64-bit hash of the surrogate key compares fixed-width ints
+    # instead of variable-length strings; equal keys share a hash, so row
+    # pairs still land adjacent (ordering between different keys is by hash,
+    # not lexicographic - only the pairing matters for the report)
     # Use a temporary sort key to preserve input order (file1=0, file2=1) rather than alphabetical
-    output_df = output_df.with_columns(
+    output_lf = output_lf.with_columns([
+        pl.col('surrogate_key').hash().alias('_surrogate_key_hash'),
         pl.when(pl.col('source') == file1_name)
         .then(pl.lit(0))
         .otherwise(pl.lit(1))
-        .alias('_source_order')
-    ).sort(
-        by=['surrogate_key', '_source_order'],
+        .alias('_source_order'),
+    ]).sort(
+        by=['_surrogate_key_hash', '_source_order'],
         descending=[False, False]
-    ).drop('_source_order')
+    ).drop(['_surrogate_key_hash', '_source_order'])
+
+    # Materialize the fused plan exactly once. The collected frame is still
+    # needed for the summary counts, so sink_csv would not save anything here.
+    output_df = output_lf.collect()
+
+    if output_df.is_empty():
+        return False, None, {
+            'total_differences': 0,
+            'unique_rows': 0,
+            'modified_rows': 0,
+            'files_compared': [file1_name, file2_name],
+            'common_columns': len(common_pool),
+            'key_columns_used': key_columns
+        }
+
+    if output_format == 'feather':
+        output_df.write_ipc(output_file, compression='lz4')
+    elif output_format == 'parquet':
+        output_df.write_parquet(output_file, compression='zstd')
+    else:
+        output_df.write_csv(output_file, separator=',', quote_style="always")
 
-    output_df.write_csv(output_file, separator=',', quote_style="always")
-    
     summary = {
         'total_differences': output_df.height,
         'unique_rows': output_df.filter(pl.col('failed_columns') == 'UNIQUE ROW').height,
